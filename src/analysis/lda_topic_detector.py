@@ -1,5 +1,5 @@
-import re
 import json
+import sys
 from tqdm import tqdm
 import pandas as pd
 from gensim import corpora
@@ -8,6 +8,7 @@ import nltk
 from nltk.corpus import stopwords
 from nltk.tokenize import word_tokenize
 import string
+from src.utils.corpus_registry import processed_path
 
 nltk.download('punkt')
 nltk.download('stopwords')
@@ -65,28 +66,26 @@ def relate_docidx_to_base_name(file_schema_path='data/processed/file_schema.json
     with open(file_schema_path, 'r') as f:
         file_schema = json.load(f)
     
-    def get_date_from_base_name(base_name):
-        year, month, day, debate_num = re.findall(r'\d+', base_name)
-        return f"{year}-{month}-{day}"
-
     df = pd.read_csv(debate_topics_path)
     df['Debate_ID'] = df['Document'].apply(lambda x: list(file_schema.keys())[x])
-    df['Date'] = df["Debate_ID"].apply(lambda x: get_date_from_base_name(x))
+    df['Date'] = df["Debate_ID"].apply(lambda x: f"{file_schema[x]['year']}-{file_schema[x]['month']}-{file_schema[x]['day']}")
     df["Debate_Num"] = df["Debate_ID"].apply(lambda x: file_schema[x]["debate_num"])
     df["House"] = df["Debate_ID"].apply(lambda x: file_schema[x]["chamber"])
     df = df[["Date", "Debate_Num", "House", "Debate_ID", "Topic", "Probability"]]
     df.to_csv(debate_topics_path, index=False)
 
-def main():
-    file_schema_path = 'data/processed/file_schema.json'
+def main(corpus='NL'):
+    file_schema_path = processed_path(corpus, 'file_schema.json')
+    debate_topics_path = processed_path(corpus, 'debate_topics.csv')
     texts = load_debates(file_schema_path)
     lda_model, doc_topics = apply_lda(texts, num_topics=5)
     print_lda_topics(lda_model)
     print_doc_topics(doc_topics)
-    save_doc_topics_to_csv(doc_topics)
-    relate_docidx_to_base_name()
+    save_doc_topics_to_csv(doc_topics, output_path=debate_topics_path)
+    relate_docidx_to_base_name(file_schema_path=file_schema_path, debate_topics_path=debate_topics_path)
 
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
\ No newline at end of file
@@ -1,5 +1,7 @@
 import pandas as pd
 import json
+import sys
+from src.utils.corpus_registry import processed_path
 
 def get_speaker_count(file_schema_path, outdir):
 
@@ -27,10 +29,11 @@ def get_speaker_count(file_schema_path, outdir):
         df = pd.concat([df, df_out])
         
     df.to_csv(f'{outdir}/speaker_count.csv', index=False)
-    print("Speaker count data saved to ./data/processed/speaker_count.csv")
+    print(f"Speaker count data saved to {outdir}/speaker_count.csv")
 
-def main():
-    get_speaker_count('./data/processed/file_schema.json', './data/processed')
+def main(corpus='NL'):
+    get_speaker_count(processed_path(corpus, 'file_schema.json'), processed_path(corpus))
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
\ No newline at end of file
@@ -0,0 +1,284 @@
+import sys
+import os
+import re
+import csv
+import json
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from tqdm import tqdm
+from src.utils.corpus_registry import processed_path
+
+TOKEN_PATTERN = re.compile(r"[a-z][a-z'-]+")
+
+def tokenize(text):
+    """
+    Split a text into lowercase words of at least two letters.
+
+    Args:
+        text (str): Text to tokenize.
+
+    Returns:
+        list: Words of the text.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+def load_utterances(debate):
+    """
+    Load the utterances of a debate with their speaker and party.
+
+    Args:
+        debate (dict): File schema entry of the debate.
+
+    Returns:
+        pd.DataFrame: Utterances with the columns 'text', 'Speaker_name' and 'Speaker_party'.
+    """
+    txt = pd.read_table(debate['src_path_txt'], header=None, names=['ID', 'text'], sep='\t', quoting=csv.QUOTE_NONE)
+    tsv = pd.read_table(debate['src_path_tsv'], sep='\t', index_col=False, usecols=['ID', 'Speaker_name', 'Speaker_party'])
+
+    df = txt.merge(tsv, on='ID', how='inner')
+    df['Speaker_party'] = df['Speaker_party'].fillna('-')
+    return df.dropna(subset=['text', 'Speaker_name'])
+
+def build_term_counts(file_schema):
+    """
+    Count the words of every speaker and party over all debates.
+
+    Counts are first collected per member, i.e. per combination of speaker and party (speakers can change
+    parties), and then summed to speakers and parties with sparse indicator matrices.
+
+    Args:
+        file_schema (dict): File schema dictionary.
+
+    Returns:
+        tuple: Speakers (DataFrame), parties (DataFrame), speaker x term counts, party x term counts
+               (scipy.sparse.csr_matrix) and the vocabulary (list).
+    """
+    vocabulary = {}
+    members = {}
+    member_utterances = []
+    rows, cols, counts = [], [], []
+
+    for base_name in tqdm(file_schema.keys(), desc='Counting words'):
+        utterances = load_utterances(file_schema[base_name])
+
+        debate_rows, debate_cols = [], []
+        for text, name, party in utterances[['text', 'Speaker_name', 'Speaker_party']].itertuples(index=False):
+            member = members.setdefault((name, party), len(members))
+            if member == len(member_utterances):
+                member_utterances.append(0)
+            member_utterances[member] += 1
+
+            term_ids = [vocabulary.setdefault(token, len(vocabulary)) for token in tokenize(text)]
+            debate_rows.extend([member] * len(term_ids))
+            debate_cols.extend(term_ids)
+
+        # Compress the counts of each debate to unique (member, term) pairs to keep memory bounded
+        if debate_cols:
+            pairs = np.asarray(debate_rows, dtype=np.int64) << 32 | np.asarray(debate_cols, dtype=np.int64)
+            pairs, pair_counts = np.unique(pairs, return_counts=True)
+            rows.append((pairs >> 32).astype(np.int32))
+            cols.append((pairs & 0xFFFFFFFF).astype(np.int32))
+            counts.append(pair_counts.astype(np.float32))
+
+    member_terms = sparse.coo_matrix(
+        (np.concatenate(counts), (np.concatenate(rows), np.concatenate(cols))),
+        shape=(len(members), len(vocabulary))
+    ).tocsr()
+
+    member_df = pd.DataFrame(list(members.keys()), columns=['Speaker_name', 'Speaker_party'])
+    member_df['n_utterances'] = member_utterances
+    member_df['n_words'] = np.asarray(member_terms.sum(axis=1)).ravel()
+
+    # Sum members to speakers and parties, a speaker is listed with the party they spoke most for
+    speaker_names, speaker_idx = np.unique(member_df['Speaker_name'].to_numpy(), return_inverse=True)
+    party_names, party_idx = np.unique(member_df['Speaker_party'].to_numpy(), return_inverse=True)
+    to_speaker = sparse.csr_matrix((np.ones(len(member_df)), (speaker_idx, np.arange(len(member_df)))), shape=(len(speaker_names), len(member_df)))
+    to_party = sparse.csr_matrix((np.ones(len(member_df)), (party_idx, np.arange(len(member_df)))), shape=(len(party_names), len(member_df)))
+
+    main_party = member_df.sort_values('n_words', ascending=False).drop_duplicates('Speaker_name').set_index('Speaker_name')['Speaker_party']
+    speakers = pd.DataFrame({
+        'Speaker_name': speaker_names,
+        'Speaker_party': main_party.loc[speaker_names].to_numpy(),
+        'n_utterances': (to_speaker @ member_df['n_utterances'].to_numpy()).astype(int),
+        'n_words': (to_speaker @ member_df['n_words'].to_numpy()).astype(int),
+    })
+    parties = pd.DataFrame({
+        'Speaker_party': party_names,
+        'n_speakers': np.bincount(party_idx),
+        'n_utterances': (to_party @ member_df['n_utterances'].to_numpy()).astype(int),
+        'n_words': (to_party @ member_df['n_words'].to_numpy()).astype(int),
+    })
+
+    vocabulary = sorted(vocabulary, key=vocabulary.get)
+    return speakers, parties, (to_speaker @ member_terms).tocsr(), (to_party @ member_terms).tocsr(), vocabulary
+
+def tfidf(term_counts, min_df=2, max_df=0.9):
+    """
+    Weight term counts with sublinear TF-IDF and normalize each row to unit length.
+
+    Terms used by fewer than min_df rows or by more than max_df of all rows are dropped, the latter removes
+    stopwords and the procedural language shared by all speakers.
+
+    Args:
+        term_counts (scipy.sparse.csr_matrix): Rows x term counts.
+        min_df (int): Minimum number of rows using a term.
+        max_df (float): Maximum share of rows using a term.
+
+    Returns:
+        tuple: TF-IDF matrix (scipy.sparse.csr_matrix) and the indices of the kept terms.
+    """
+    n_rows = term_counts.shape[0]
+    doc_freq = np.bincount(term_counts.indices, minlength=term_counts.shape[1])
+    keep = np.flatnonzero((doc_freq >= min_df) & (doc_freq <= max_df * n_rows))
+
+    X = term_counts[:, keep].astype(np.float32)
+    X.data = 1 + np.log(X.data)
+    idf = np.log((1 + n_rows) / (1 + doc_freq[keep])) + 1
+    X = X @ sparse.diags(idf.astype(np.float32))
+
+    norms = np.sqrt(np.asarray(X.multiply(X).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ X, keep
+
+def nearest_neighbours(X, k=10, batch_size=1000):
+    """
+    Find the k most similar rows of every row by cosine similarity.
+
+    The similarities are computed in batches of rows, so memory only grows with batch_size x rows.
+
+    Args:
+        X (scipy.sparse.csr_matrix): Row-normalized matrix, e.g. from tfidf.
+        k (int): Number of neighbours per row.
+        batch_size (int): Number of rows per batch.
+
+    Returns:
+        tuple: Neighbour indices and similarities, both arrays of shape rows x k, sorted by similarity.
+               Rows without any shared term (similarity 0) are not neighbours, their slots have index -1.
+    """
+    n_rows = X.shape[0]
+    k = min(k, n_rows - 1)
+    X_T = X.T.tocsc()
+    indices = np.full((n_rows, k), -1, dtype=np.int32)
+    scores = np.zeros((n_rows, k), dtype=np.float32)
+    if k < 1:
+        return indices, scores
+
+    for start in range(0, n_rows, batch_size):
+        stop = min(start + batch_size, n_rows)
+        sim = (X[start:stop] @ X_T).toarray()
+        sim[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+
+        top = np.argpartition(-sim, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(sim, top, axis=1)
+        order = np.argsort(-top_scores, axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        # Keep only neighbours that share terms, this also excludes rows without any term
+        found = top_scores > 0
+        indices[start:stop] = np.where(found, top, -1)
+        scores[start:stop] = np.where(found, top_scores, 0)
+
+    return indices, scores
+
+def build_similarity_index(file_schema_path='data/processed/file_schema.json', outdir='data/processed/similarity', k=10, min_df=2, max_df=0.9):
+    """
+    Build TF-IDF vectors and nearest-neighbour indices of all speakers and parties and save them.
+
+    Saves to outdir: speakers.csv / parties.csv (labels, row order of the matrices), speaker_tfidf.npz /
+    party_tfidf.npz (sparse TF-IDF matrices), speaker_neighbours.npz / party_neighbours.npz (neighbour indices
+    and similarities) and vocabulary.json (terms, column order of the matrices).
+
+    Args:
+        file_schema_path (str): Path to the file schema JSON.
+        outdir (str): Output directory.
+        k (int): Number of neighbours to store per speaker and party.
+        min_df (int): Minimum number of speakers using a term, see tfidf.
+        max_df (float): Maximum share of speakers using a term, see tfidf.
+
+    Returns:
+        None
+    """
+    with open(file_schema_path, 'r') as f:
+        file_schema = json.load(f)
+
+    speakers, parties, speaker_counts, party_counts, vocabulary = build_term_counts(file_schema)
+
+    # Use the same terms for parties as for speakers, so both matrices share the vocabulary
+    speaker_tfidf, keep = tfidf(speaker_counts, min_df=min_df, max_df=max_df)
+    if len(keep) == 0:
+        raise ValueError(
+            f'No terms left for {len(speakers)} speakers with min_df={min_df} and max_df={max_df}, '
+            'lower min_df or raise max_df for small corpora.'
+        )
+    party_tfidf, _ = tfidf(party_counts[:, keep], min_df=1, max_df=1.0)
+
+    os.makedirs(outdir, exist_ok=True)
+
+    for name, labels_file, labels, X in [('speaker', 'speakers.csv', speakers, speaker_tfidf), ('party', 'parties.csv', parties, party_tfidf)]:
+        # Rows without any kept term have no vector and cannot be compared
+        labels['n_terms'] = X.getnnz(axis=1)
+        n_empty = int((labels['n_terms'] == 0).sum())
+        if n_empty > 0:
+            print(f'Warning: {n_empty} of {len(labels)} {labels_file[:-4]} use none of the kept terms and get no neighbours.')
+
+        indices, scores = nearest_neighbours(X, k=k)
+        labels.to_csv(os.path.join(outdir, labels_file), index=False)
+        sparse.save_npz(os.path.join(outdir, f'{name}_tfidf.npz'), X.tocsr())
+        np.savez(os.path.join(outdir, f'{name}_neighbours.npz'), indices=indices, scores=scores)
+
+    with open(os.path.join(outdir, 'vocabulary.json'), 'w') as f:
+        json.dump([vocabulary[i] for i in keep], f)
+
+    print(f'Built similarity index of {len(speakers)} speakers and {len(parties)} parties over {len(keep)} terms.')
+
+def load_similarity_index(outdir='data/processed/similarity', level='speaker'):
+    """
+    Load the labels and nearest-neighbour index of speakers or parties.
+
+    Args:
+        outdir (str): Directory of the similarity index.
+        level (str): 'speaker' or 'party'.
+
+    Returns:
+        tuple: Labels (DataFrame), neighbour indices and similarities (arrays of shape rows x k).
+    """
+    labels = pd.read_csv(os.path.join(outdir, 'speakers.csv' if level == 'speaker' else 'parties.csv'))
+    neighbours = np.load(os.path.join(outdir, f'{level}_neighbours.npz'))
+    return labels, neighbours['indices'], neighbours['scores']
+
+def most_similar(name, labels, indices, scores, k=10):
+    """
+    Look up the most similar speakers or parties in a loaded index.
+
+    Args:
+        name (str): Speaker name or party, as in the labels.
+        labels (pd.DataFrame): Labels from load_similarity_index.
+        indices (np.ndarray): Neighbour indices from load_similarity_index.
+        scores (np.ndarray): Neighbour similarities from load_similarity_index.
+        k (int): Number of neighbours to return, at most the number stored in the index.
+
+    Returns:
+        pd.DataFrame: The most similar speakers or parties with their similarity, empty if there are none.
+    """
+    key = 'Speaker_name' if 'Speaker_name' in labels.columns else 'Speaker_party'
+    row = np.flatnonzero(labels[key].to_numpy() == name)
+    if len(row) == 0:
+        raise KeyError(f"'{name}' not found in the similarity index.")
+
+    found = indices[row[0], :k] >= 0
+    similar = labels.iloc[indices[row[0], :k][found]].copy()
+    similar['Similarity'] = scores[row[0], :k][found]
+    return similar.reset_index(drop=True)
+
+def main(corpus='NL'):
+    build_similarity_index(
+        file_schema_path=processed_path(corpus, 'file_schema.json'),
+        outdir=processed_path(corpus, 'similarity')
+    )
+
+
+if __name__ == '__main__':
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
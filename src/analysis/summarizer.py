@@ -1,32 +1,61 @@
 from transformers import T5Tokenizer, T5ForConditionalGeneration
+import os
 import json
+import sys
 from tqdm import tqdm
 import pandas as pd
+import time
+from src.utils.profiling import profile_stage, PROFILE_LOG_PATH, PROFILE_LOG_FILE
+from src.utils.corpus_registry import processed_path
+from src.analysis.summary_defaults import DEFAULT_MAX_LENGTH
 
 model_name = 't5-small'
-tokenizer = T5Tokenizer.from_pretrained(model_name)
-model = T5ForConditionalGeneration.from_pretrained(model_name)
+tokenizer = None
+model = None
 
-def summarize(text):
+def load_model(log_path=PROFILE_LOG_PATH, corpus=None):
+    # load the model once per process and profile the loading as part of the summarize stage
+    global tokenizer, model
+    if model is None:
+        with profile_stage('summarize', log_path=log_path, corpus=corpus) as record:
+            record['step'] = 'load_model'
+            tokenizer = T5Tokenizer.from_pretrained(model_name)
+            model = T5ForConditionalGeneration.from_pretrained(model_name)
+    return tokenizer, model
+
+def summarize(text, max_length=DEFAULT_MAX_LENGTH, stats=None):
+    tokenizer, model = load_model()
     inputs = tokenizer.encode("summarize: " + text, return_tensors="pt", max_length=1024, truncation=True)
-    summary_ids = model.generate(inputs, max_length=150, min_length=40, length_penalty=2.0, num_beams=4, early_stopping=True)
+    start = time.perf_counter()
+    summary_ids = model.generate(inputs, max_length=max_length, min_length=min(40, max_length // 2), length_penalty=2.0, num_beams=4, early_stopping=True)
+    forward_time = time.perf_counter() - start
     summary = tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+
+    # report token counts and generation time to the caller, e.g. for profiling
+    if stats is not None:
+        stats['n_tokens'] = inputs.shape[1]
+        stats['n_summary_tokens'] = summary_ids.shape[1]
+        stats['forward_time'] = forward_time
     return summary
 
-def summarize_all_debates(file_schema_path='data/processed/file_schema.json', outpath='data/processed/summaries.csv'):
+def summarize_all_debates(file_schema_path='data/processed/file_schema.json', outpath='data/processed/summaries.csv', max_length=DEFAULT_MAX_LENGTH, profiler=None, log_path=PROFILE_LOG_PATH, corpus=None):
     # load the file schema to extract the debates' paths and metadata
     with open(file_schema_path, 'r') as f:
         file_schema = json.load(f)
 
+    load_model(log_path=log_path, corpus=corpus)
+
     counter = 0
     df = pd.DataFrame()
     for base_name in tqdm(file_schema.keys(), desc='Summarizing debates'):
         
         # Summarize the debate
-        with open(file_schema[base_name]['conc_debate_path'], 'r') as f:
-            text = f.read()
+        with profile_stage('summarize', debate_id=base_name, log_path=log_path, profiler=profiler, corpus=file_schema[base_name].get('corpus', corpus)) as record:
+            with open(file_schema[base_name]['conc_debate_path'], 'r') as f:
+                text = f.read()
+            record['bytes_read'] = len(text.encode('utf-8'))
 
-        summary = summarize(text)
+            summary = summarize(text, max_length=max_length, stats=record)
      
         # Collect metadata and store the summary
         df_tmp = pd.DataFrame.from_dict({
@@ -34,7 +63,8 @@ def summarize_all_debates(file_schema_path='data/processed/file_schema.json', ou
             "date": [f"{file_schema[base_name]['year']}-{file_schema[base_name]['month']}-{file_schema[base_name]['day']}"],
             "chamber": [file_schema[base_name]['chamber']],
             "debate_num": [file_schema[base_name]['debate_num']],
-            "summary": [summary]
+            "summary": [summary],
+            "max_length": [max_length]
         })
 
         df = pd.concat([df, df_tmp])
@@ -45,12 +75,27 @@ def summarize_all_debates(file_schema_path='data/processed/file_schema.json', ou
         print(f'Error: Summarized {counter} debates, but there are {len(file_schema)} debates in the schema.')
     else:
         print(f'Summarized {counter} debates.')
-    df.to_csv(outpath, index=False)
+
+    # Merge into the existing summaries, which also hold on-demand summaries of the dashboard and other lengths
+    with profile_stage('summarize', log_path=log_path, corpus=corpus) as record:
+        record['step'] = 'write_csv'
+        if os.path.exists(outpath):
+            df_existing = pd.read_csv(outpath)
+            if 'max_length' not in df_existing.columns:
+                df_existing['max_length'] = DEFAULT_MAX_LENGTH
+            df = pd.concat([df_existing, df]).drop_duplicates(subset=['ID', 'max_length'], keep='last')
+        df.to_csv(outpath, index=False)
         
 
-def main():    
-    summarize_all_debates()
+def main(corpus='NL'):    
+    summarize_all_debates(
+        file_schema_path=processed_path(corpus, 'file_schema.json'),
+        outpath=processed_path(corpus, 'summaries.csv'),
+        log_path=processed_path(corpus, PROFILE_LOG_FILE),
+        corpus=corpus
+    )
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
\ No newline at end of file
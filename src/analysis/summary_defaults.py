@@ -0,0 +1,8 @@
+# Summary settings shared by the summarizer, the summary worker and the dashboard.
+# Kept in a separate module so they can be imported without loading the summarization model.
+
+# Maximum summary length in tokens, used for the precomputed summaries in summaries.csv
+DEFAULT_MAX_LENGTH = 150
+
+# Summary lengths that can be requested in the dashboard
+SUMMARY_LENGTHS = [50, 100, DEFAULT_MAX_LENGTH, 250]
@@ -0,0 +1,191 @@
+import os
+import json
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import pandas as pd
+from src.analysis.summary_defaults import DEFAULT_MAX_LENGTH
+
+def summarize_debate(base_name, debate, max_length=DEFAULT_MAX_LENGTH):
+    """
+    Summarize a single debate. Runs inside a worker process of the SummaryWorker.
+
+    Args:
+        base_name (str): Base name of the debate.
+        debate (dict): File schema entry of the debate.
+        max_length (int): Maximum length of the summary in tokens.
+
+    Returns:
+        dict: Summary row in the format of summaries.csv.
+    """
+    # Import here so the model is only loaded in the worker processes and not in the dashboard
+    from src.analysis.summarizer import summarize
+
+    with open(debate['conc_debate_path'], 'r') as f:
+        text = f.read()
+
+    return {
+        "ID": debate['text_id'],
+        "date": f"{debate['year']}-{debate['month']}-{debate['day']}",
+        "chamber": debate['chamber'],
+        "debate_num": debate['debate_num'],
+        "summary": summarize(text, max_length=max_length),
+        "max_length": max_length
+    }
+
+class SummaryWorker:
+    """
+    Background worker that summarizes debates on demand and persists the results to the summary cache.
+
+    Summaries are computed in a separate process so that requests from the dashboard never block the UI.
+    Summaries that are already in the cache (or currently being computed) are not computed again.
+
+    Args:
+        file_schema_path (str): Path to the file schema JSON.
+        cache_path (str): Path to the summaries CSV used as cache.
+        max_workers (int): Number of worker processes, each loads its own copy of the model.
+    """
+    def __init__(self, file_schema_path='data/processed/file_schema.json', cache_path='data/processed/summaries.csv', max_workers=1):
+        with open(file_schema_path, 'r') as f:
+            self.file_schema = json.load(f)
+        self.cache_path = cache_path
+
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+        self._pending = {}
+        self._errors = {}
+
+        self.max_workers = max_workers
+        self._executor = self._new_executor()
+
+    def _new_executor(self):
+        """
+        Start a new pool of worker processes.
+
+        Returns:
+            ProcessPoolExecutor: The worker pool.
+        """
+        # spawn fresh processes, forking the dashboard process with its threads is not safe
+        return ProcessPoolExecutor(max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+
+    def _load_cache(self):
+        """
+        Load the cached summaries, keyed by text ID and summary length.
+
+        Returns:
+            dict: Summaries by (text_id, max_length).
+        """
+        if not os.path.exists(self.cache_path):
+            return {}
+
+        df = pd.read_csv(self.cache_path)
+        if 'max_length' not in df.columns:
+            df['max_length'] = DEFAULT_MAX_LENGTH
+        return {(row['ID'], int(row['max_length'])): row['summary'] for _, row in df.iterrows()}
+
+    def get_summary(self, base_name, max_length=DEFAULT_MAX_LENGTH):
+        """
+        Get a cached summary.
+
+        Args:
+            base_name (str): Base name of the debate.
+            max_length (int): Maximum length of the summary in tokens.
+
+        Returns:
+            str: The summary, or None if it has not been computed yet.
+        """
+        with self._lock:
+            return self._cache.get((self.file_schema[base_name]['text_id'], max_length))
+
+    def get_error(self, base_name, max_length=DEFAULT_MAX_LENGTH):
+        """
+        Get the error message of a failed summary request.
+
+        Args:
+            base_name (str): Base name of the debate.
+            max_length (int): Maximum length of the summary in tokens.
+
+        Returns:
+            str: The error message, or None if the request did not fail.
+        """
+        with self._lock:
+            return self._errors.get((base_name, max_length))
+
+    def is_pending(self, base_name, max_length=DEFAULT_MAX_LENGTH):
+        """
+        Check whether a summary is currently being computed.
+
+        Args:
+            base_name (str): Base name of the debate.
+            max_length (int): Maximum length of the summary in tokens.
+
+        Returns:
+            bool: True if the summary is queued or being computed.
+        """
+        with self._lock:
+            return (base_name, max_length) in self._pending
+
+    def submit(self, base_name, max_length=DEFAULT_MAX_LENGTH):
+        """
+        Request a summary of a debate. Returns immediately, the summary is computed in the background.
+
+        Args:
+            base_name (str): Base name of the debate.
+            max_length (int): Maximum length of the summary in tokens.
+
+        Returns:
+            bool: True if the summary was submitted, False if it is cached, already pending or the worker failed.
+        """
+        key = (base_name, max_length)
+        debate = self.file_schema[base_name]
+        with self._lock:
+            if (debate['text_id'], max_length) in self._cache or key in self._pending:
+                return False
+            self._errors.pop(key, None)
+            try:
+                future = self._executor.submit(summarize_debate, base_name, debate, max_length)
+            except BrokenProcessPool as e:
+                # A worker process died, e.g. while loading the model, restart the pool for the next requests
+                self._errors[key] = f'The summary worker stopped unexpectedly: {e}'
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                return False
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._on_done(key, f))
+        return True
+
+    def _on_done(self, key, future):
+        """
+        Store a finished summary in the cache and persist it to the cache file.
+
+        Args:
+            key (tuple): Base name and summary length of the request.
+            future (concurrent.futures.Future): The finished request.
+
+        Returns:
+            None
+        """
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                self._errors[key] = str(future.exception())
+                return
+
+            result = future.result()
+            self._cache[(result['ID'], result['max_length'])] = result['summary']
+            pd.DataFrame([result]).to_csv(self.cache_path, mode='a', index=False, header=not os.path.exists(self.cache_path))
+
+    def shutdown(self, wait=False):
+        """
+        Stop the worker processes. Pending requests that have not started yet are cancelled.
+
+        Args:
+            wait (bool): Whether to wait for running requests to finish.
+
+        Returns:
+            None
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
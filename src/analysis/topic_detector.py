@@ -1,10 +1,19 @@
 import json
+import sys
 from tqdm import tqdm
 import pandas as pd
 from transformers import pipeline
+import time
+from src.utils.profiling import profile_stage, PROFILE_LOG_PATH, PROFILE_LOG_FILE
+from src.utils.corpus_registry import processed_path
 
-def detect_topic(text, candidate_topics, classifier):
+def detect_topic(text, candidate_topics, classifier, stats=None):
+    start = time.perf_counter()
     result = classifier(text, candidate_topics)
+
+    # report the classification time to the caller, e.g. for profiling
+    if stats is not None:
+        stats['forward_time'] = time.perf_counter() - start
     return result['labels'], result['scores']
 
 
@@ -12,7 +21,10 @@ def detect_topics_in_all(
         candidate_topics,
         classifier,
         file_schema_path='data/processed/file_schema.json', 
-        outpath='data/processed/topics.csv'
+        outpath='data/processed/topics.csv',
+        profiler=None,
+        log_path=PROFILE_LOG_PATH,
+        corpus=None
         ):
     
     # load the file schema to extract the debates' paths and metadata
@@ -26,10 +38,12 @@ def detect_topics_in_all(
     for base_name in tqdm(file_schema.keys(), desc='Detect debates topics'):
         
         # Summarize the debate
-        with open(file_schema[base_name]['conc_debate_path'], 'r') as f:
-            text = f.read()
+        with profile_stage('detect_topics', debate_id=base_name, log_path=log_path, profiler=profiler, corpus=file_schema[base_name].get('corpus', corpus)) as record:
+            with open(file_schema[base_name]['conc_debate_path'], 'r') as f:
+                text = f.read()
+            record['bytes_read'] = len(text.encode('utf-8'))
 
-        labels, scores = detect_topic(text, candidate_topics=candidate_topics, classifier=classifier)
+            labels, scores = detect_topic(text, candidate_topics=candidate_topics, classifier=classifier, stats=record)
 
         # Collect scores:
         df_tmp_scores = pd.DataFrame([scores], columns=labels)
@@ -55,18 +69,28 @@ def detect_topics_in_all(
         print(f'Processed {counter} debates.')
 
     # Export the results
-    df.to_csv(outpath, index=False)
+    with profile_stage('detect_topics', log_path=log_path, corpus=corpus) as record:
+        record['step'] = 'write_csv'
+        df.to_csv(outpath, index=False)
 
 
-def main():
-    classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-3")
+def main(corpus='NL'):
+    log_path = processed_path(corpus, PROFILE_LOG_FILE)
+    with profile_stage('detect_topics', log_path=log_path, corpus=corpus) as record:
+        record['step'] = 'load_model'
+        classifier = pipeline("zero-shot-classification", model="valhalla/distilbart-mnli-12-3")
     candidate_topics = ["security", "geopolitics", "technologies", "energy", "crime", "climate", "defence"]     
     
     detect_topics_in_all(
         candidate_topics=candidate_topics,
-        classifier=classifier
+        classifier=classifier,
+        file_schema_path=processed_path(corpus, 'file_schema.json'),
+        outpath=processed_path(corpus, 'topics.csv'),
+        log_path=log_path,
+        corpus=corpus
     )
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
\ No newline at end of file
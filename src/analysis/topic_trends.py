@@ -0,0 +1,270 @@
+import sys
+import numpy as np
+import pandas as pd
+from src.utils.corpus_registry import processed_path
+
+# numpy counts days from 1970-01-01, a Thursday, so weeks starting on Monday are offset by 4 days
+_MONDAY_OFFSET = 4
+
+def load_topic_scores(path='data/processed/debate_topics.csv'):
+    """
+    Load per-debate topic scores as a dense debate x topic matrix.
+
+    Supports the long format of the LDA topics (debate_topics.csv, topics missing for a debate have a score of 0)
+    and the wide format of the zero-shot topics (topics.csv).
+
+    Args:
+        path (str): Path to the topic scores CSV.
+
+    Returns:
+        tuple: Debate dates (datetime64[D] array), topic names (list) and scores (2D array, debates x topics).
+    """
+    df = pd.read_csv(path)
+
+    if 'Probability' in df.columns:
+        debate_ids, debate_idx = np.unique(df['Debate_ID'].to_numpy(), return_inverse=True)
+        topics, topic_idx = np.unique(df['Topic'].to_numpy(), return_inverse=True)
+        scores = np.zeros((len(debate_ids), len(topics)))
+        scores[debate_idx, topic_idx] = df['Probability'].to_numpy()
+
+        dates = np.empty(len(debate_ids), dtype='datetime64[D]')
+        dates[debate_idx] = df['Date'].to_numpy(dtype='datetime64[D]')
+    else:
+        topics = [col for col in df.columns if col not in ['ID', 'date', 'chamber', 'debate_num']]
+        scores = df[topics].to_numpy(dtype=float)
+        dates = df['date'].to_numpy(dtype='datetime64[D]')
+
+    return dates, list(topics), scores
+
+def to_periods(dates, freq='W'):
+    """
+    Map dates to the start of their period.
+
+    Args:
+        dates (np.ndarray): Dates as datetime64[D] array.
+        freq (str): 'D' for days, 'W' for weeks starting on Monday, 'M' for months.
+
+    Returns:
+        np.ndarray: Period start dates as datetime64[D] array.
+    """
+    if freq == 'D':
+        return dates.astype('datetime64[D]')
+    if freq == 'W':
+        days = dates.astype('datetime64[D]').astype(np.int64)
+        return ((days - _MONDAY_OFFSET) // 7 * 7 + _MONDAY_OFFSET).astype('datetime64[D]')
+    if freq == 'M':
+        return dates.astype('datetime64[M]').astype('datetime64[D]')
+    raise ValueError(f"Unknown frequency '{freq}', expected 'D', 'W' or 'M'.")
+
+def build_period_topic_matrix(dates, scores, freq='W'):
+    """
+    Aggregate debate topic scores into a dense period x topic matrix.
+
+    Periods without debates are included with a debate count of 0, so that rolling windows span equal time.
+
+    Args:
+        dates (np.ndarray): Debate dates as datetime64[D] array.
+        scores (np.ndarray): Topic scores, debates x topics.
+        freq (str): Period frequency, see to_periods.
+
+    Returns:
+        tuple: Period start dates, summed scores (periods x topics) and number of debates per period.
+    """
+    debate_periods = to_periods(dates, freq)
+    if freq == 'M':
+        months = np.arange(debate_periods.min().astype('datetime64[M]'), debate_periods.max().astype('datetime64[M]') + 1)
+        periods = months.astype('datetime64[D]')
+    else:
+        step = 7 if freq == 'W' else 1
+        periods = np.arange(debate_periods.min(), debate_periods.max() + 1, step)
+
+    idx = np.searchsorted(periods, debate_periods)
+    score_sum = np.zeros((len(periods), scores.shape[1]))
+    np.add.at(score_sum, idx, scores)
+    counts = np.bincount(idx, minlength=len(periods))
+
+    return periods, score_sum, counts
+
+def rolling_sum(x, window):
+    """
+    Trailing rolling sum along the first axis, using a cumulative sum.
+
+    Args:
+        x (np.ndarray): 1D or 2D array.
+        window (int): Window size. The first window - 1 rows sum over fewer elements.
+
+    Returns:
+        np.ndarray: Rolling sums with the same shape as x.
+    """
+    csum = np.cumsum(x, axis=0, dtype=float)
+    out = csum.copy()
+    out[window:] = csum[window:] - csum[:-window]
+    return out
+
+def preceding(x):
+    """
+    Shift an array by one period, so that each row holds the value of the preceding period.
+
+    Args:
+        x (np.ndarray): 1D or 2D array.
+
+    Returns:
+        np.ndarray: Shifted array with the same shape as x, the first row is 0.
+    """
+    return np.concatenate([np.zeros_like(x[:1]), x[:-1]])
+
+def compute_trends(score_sum, counts, window=4, z_threshold=2.0, min_debates=3, min_periods=2, min_std=0.1):
+    """
+    Compute rolling topic prevalence and flag bursts.
+
+    The prevalence of a topic in a period is its mean score over the debates of that period. The rolling
+    prevalence weights periods by their number of debates, so weeks with a single debate do not dominate.
+    A burst is a period whose prevalence exceeds the prevalence of the preceding window by more than
+    z_threshold standard deviations. Mean and standard deviation of the preceding window are weighted by the
+    number of debates per period, and the standard deviation is at least min_std, so that small fluctuations
+    in a stable window are no bursts. Periods with fewer than min_debates debates, or whose preceding window
+    has fewer than min_periods periods with debates, are not scored.
+
+    Args:
+        score_sum (np.ndarray): Summed scores, periods x topics.
+        counts (np.ndarray): Number of debates per period.
+        window (int): Rolling window size in periods.
+        z_threshold (float): Z-score above which a period is flagged as burst.
+        min_debates (int): Minimum number of debates of a period to score it.
+        min_periods (int): Minimum number of periods with debates in the preceding window to score a period.
+        min_std (float): Lower bound of the standard deviation of the preceding window.
+
+    Returns:
+        dict: Arrays (periods x topics) 'prevalence', 'rolling_mean', 'rolling_prevalence', 'z_score' and 'burst'.
+    """
+    has_debates = (counts > 0)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        prevalence = np.where(has_debates, score_sum / counts[:, None], np.nan)
+
+        # unweighted rolling mean over periods with debates
+        filled = np.nan_to_num(prevalence)
+        n_periods = rolling_sum(has_debates.astype(float), window)
+        rolling_mean = rolling_sum(filled, window) / n_periods
+
+        # debate-count-weighted rolling prevalence
+        rolling_prevalence = rolling_sum(score_sum, window) / rolling_sum(counts, window)[:, None]
+
+        # debate-count-weighted baseline of the preceding window for burst detection
+        weighted_sq = np.where(has_debates, score_sum ** 2 / counts[:, None], 0)
+        base_counts = preceding(rolling_sum(counts, window))[:, None]
+        base_mean = preceding(rolling_sum(score_sum, window)) / base_counts
+        base_var = preceding(rolling_sum(weighted_sq, window)) / base_counts - base_mean ** 2
+        base_std = np.maximum(np.sqrt(np.maximum(base_var, 0)), min_std)
+        z_score = (prevalence - base_mean) / base_std
+
+    scored = (counts >= min_debates)[:, None] & (preceding(n_periods) >= min_periods)
+    z_score[~(scored & np.isfinite(z_score))] = np.nan
+    burst = np.nan_to_num(z_score) > z_threshold
+
+    return {
+        'prevalence': prevalence,
+        'rolling_mean': rolling_mean,
+        'rolling_prevalence': rolling_prevalence,
+        'z_score': z_score,
+        'burst': burst,
+    }
+
+def detect_change_points(score_sum, counts):
+    """
+    Find the single strongest shift in mean prevalence per topic.
+
+    For every possible split, the debate-weighted mean prevalence before and after the split is compared and
+    the split with the largest weighted between-group variance is chosen. With fewer than two periods there is
+    no split, the index is then -1 and means and score are NaN.
+
+    Args:
+        score_sum (np.ndarray): Summed scores, periods x topics.
+        counts (np.ndarray): Number of debates per period.
+
+    Returns:
+        tuple: Index of the first period after the change, mean before, mean after and score of the change
+               (arrays of length topics).
+    """
+    n_topics = score_sum.shape[1]
+    if len(counts) < 2:
+        return np.full(n_topics, -1), np.full(n_topics, np.nan), np.full(n_topics, np.nan), np.full(n_topics, np.nan)
+
+    csum_scores = np.cumsum(score_sum, axis=0)[:-1]
+    csum_counts = np.cumsum(counts)[:-1, None].astype(float)
+    total_scores = score_sum.sum(axis=0)
+    total_counts = float(counts.sum())
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_before = csum_scores / csum_counts
+        mean_after = (total_scores - csum_scores) / (total_counts - csum_counts)
+        stat = csum_counts * (total_counts - csum_counts) / total_counts * (mean_before - mean_after) ** 2
+    stat = np.nan_to_num(stat, nan=-np.inf)
+
+    best = np.argmax(stat, axis=0)
+    topic_idx = np.arange(n_topics)
+    return best + 1, mean_before[best, topic_idx], mean_after[best, topic_idx], stat[best, topic_idx]
+
+def compute_topic_trends(
+        scores_path='data/processed/debate_topics.csv',
+        outpath='data/processed/topic_trends.csv',
+        change_points_outpath='data/processed/topic_change_points.csv',
+        freq='W',
+        window=4,
+        z_threshold=2.0,
+        min_debates=3
+        ):
+    """
+    Precompute topic trends and change points and save them for the dashboard.
+
+    Args:
+        scores_path (str): Path to the topic scores CSV (debate_topics.csv or topics.csv).
+        outpath (str): Path to save the trends CSV, one row per period and topic.
+        change_points_outpath (str): Path to save the change points CSV, one row per topic.
+        freq (str): Period frequency, see to_periods.
+        window (int): Rolling window size in periods.
+        z_threshold (float): Z-score above which a period is flagged as burst.
+        min_debates (int): Minimum number of debates of a period to flag it as burst.
+
+    Returns:
+        None
+    """
+    dates, topics, scores = load_topic_scores(scores_path)
+    periods, score_sum, counts = build_period_topic_matrix(dates, scores, freq=freq)
+    trends = compute_trends(score_sum, counts, window=window, z_threshold=z_threshold, min_debates=min_debates)
+
+    n_periods, n_topics = score_sum.shape
+    df = pd.DataFrame({
+        "Period": np.repeat(periods, n_topics),
+        "Topic": np.tile(topics, n_periods),
+        "Debate_Count": np.repeat(counts, n_topics),
+        "Prevalence": trends['prevalence'].ravel(),
+        "Rolling_Mean": trends['rolling_mean'].ravel(),
+        "Rolling_Prevalence": trends['rolling_prevalence'].ravel(),
+        "Z_Score": trends['z_score'].ravel(),
+        "Burst": trends['burst'].ravel(),
+    })
+    df.to_csv(outpath, index=False)
+
+    change_idx, mean_before, mean_after, score = detect_change_points(score_sum, counts)
+    df_change = pd.DataFrame({
+        "Topic": topics,
+        "Change_Point": np.where(change_idx >= 0, periods[np.maximum(change_idx, 0)], np.datetime64('NaT')),
+        "Mean_Before": mean_before,
+        "Mean_After": mean_after,
+        "Score": score,
+    })
+    df_change.to_csv(change_points_outpath, index=False)
+
+    print(f'Computed trends for {n_topics} topics over {n_periods} periods, {int(trends["burst"].sum())} bursts detected.')
+
+def main(corpus='NL'):
+    compute_topic_trends(
+        scores_path=processed_path(corpus, 'debate_topics.csv'),
+        outpath=processed_path(corpus, 'topic_trends.csv'),
+        change_points_outpath=processed_path(corpus, 'topic_change_points.csv')
+    )
+
+
+if __name__ == '__main__':
+    # Optional corpus code as argument, e.g. 'DK'
+    main(sys.argv[1] if len(sys.argv) > 1 else 'NL')
@@ -0,0 +1,116 @@
+import os
+
+# ParlaMint corpora with their settings, missing settings are filled in by get_corpus.
+# The Dutch corpus keeps its outputs in data/processed, where they were stored before other corpora were supported.
+# The chamber of a debate is parsed from its base name, see helpers.parse_base_name, unless the corpus sets a
+# 'chamber_patterns' (chamber names with the regular expression that identifies them) or a fixed 'chamber'.
+CORPORA = {
+    'NL': {
+        'label': 'Netherlands',
+        'years': [2022],
+        'processed_dir': 'data/processed',
+    },
+    'BE': {
+        'label': 'Belgium',
+        'years': [2022],
+    },
+    'DK': {
+        'label': 'Denmark',
+        'years': [2022],
+        'chamber': 'folketing',
+    },
+    'AT': {
+        'label': 'Austria',
+        'years': [2022],
+        # e.g. '2022-01-20-027-XXVII-NRSitzung-138'
+        'chamber_patterns': {'nationalrat': r'NRSitzung', 'bundesrat': r'BRSitzung'},
+    },
+}
+
+def register_corpus(code, **settings):
+    """
+    Add a corpus to the registry or update its settings.
+
+    Args:
+        code (str): ParlaMint country code, e.g. 'NL'.
+        **settings: Settings of the corpus, see get_corpus.
+
+    Returns:
+        None
+    """
+    CORPORA.setdefault(code, {}).update(settings)
+
+def get_corpus(code):
+    """
+    Get the settings of a registered corpus.
+
+    Args:
+        code (str): ParlaMint country code, e.g. 'NL'.
+
+    Returns:
+        dict: Settings of the corpus with the keys
+            'code', 'label', 'name' (e.g. 'ParlaMint-NL-en'), 'years', 'tar_path' (archive of the corpus),
+            'folder' (folder with the text files inside the archive), 'raw_dir' (directory to extract the
+            archive to), 'processed_dir' (directory for all outputs of the corpus), 'chamber_patterns' and
+            'chamber' (how to get the chamber of a debate, None to parse it from the base name).
+    """
+    if code not in CORPORA:
+        raise KeyError(f"Unknown corpus '{code}', registered corpora: {list(CORPORA)}")
+
+    name = CORPORA[code].get('name', f'ParlaMint-{code}-en')
+    corpus = {
+        'code': code,
+        'label': code,
+        'name': name,
+        'years': [],
+        'tar_path': f'data/raw/{name}.ana.tgz',
+        'folder': f'{name}.txt',
+        'raw_dir': 'data/raw/subset',
+        'processed_dir': f'data/processed/{code}',
+        'chamber_patterns': None,
+        'chamber': None,
+    }
+    corpus.update(CORPORA[code])
+    return corpus
+
+def year_path(code, year):
+    """
+    Get the directory of the extracted text files of a corpus for a year.
+
+    Args:
+        code (str): ParlaMint country code.
+        year (int): Year of the debates.
+
+    Returns:
+        str: Path to the directory, ending with a slash.
+    """
+    corpus = get_corpus(code)
+    return f"{corpus['raw_dir']}/{corpus['folder']}/{year}/"
+
+def processed_path(code, filename=''):
+    """
+    Get the path of an output file of a corpus.
+
+    Args:
+        code (str): ParlaMint country code.
+        filename (str): Name of the output file, e.g. 'summaries.csv'. If empty, the output directory is returned.
+
+    Returns:
+        str: Path to the output file.
+    """
+    processed_dir = get_corpus(code)['processed_dir']
+    if not filename:
+        return processed_dir
+    return os.path.join(processed_dir, filename).replace('\\', '/')
+
+def available_corpora(required_file='debate_topics.csv'):
+    """
+    Get the corpora that have already been processed.
+
+    Args:
+        required_file (str): Output file that has to exist for a corpus to count as processed.
+
+    Returns:
+        list: Country codes of the processed corpora.
+    """
+    return [code for code in CORPORA if os.path.exists(processed_path(code, required_file))]
@@ -3,8 +3,14 @@ import tarfile
 from glob import glob
 import re
 import json
+from concurrent.futures import as_completed
 import pandas as pd
 from tqdm import tqdm
+try:
+    from src.utils.profiling import profile_stage, PROFILE_LOG_PATH
+except ImportError:
+    # helpers is run as a script from src/utils, see processing.py
+    from profiling import profile_stage, PROFILE_LOG_PATH
 
 def create_subset(tar_path="data/raw/ParlaMint-NL-en.ana.tgz", output_dir="data/raw/subset", folder_to_extract="ParlaMint-NL-en.txt", years=[2021, 2022]):
     """
@@ -25,12 +31,15 @@ def create_subset(tar_path="data/raw/ParlaMint-NL-en.ana.tgz", output_dir="data/
 
     # Open the tar file
     with tarfile.open(tar_path, "r:gz") as tar:
+        # List the members once, this reads through the whole compressed archive
+        members = tar.getmembers()
+
         # Loop over the specified years first
         for year in years:
             year_folder = os.path.join(output_dir, f"{folder_to_extract}/{year}")
             if not os.path.exists(year_folder):
                 # Extract folders that match the specified year
-                for member in tar.getmembers():
+                for member in members:
                     if f"{folder_to_extract}/{year}/" in member.name:
                         tar.extract(member, output_dir)
             else:
@@ -38,41 +47,83 @@ def create_subset(tar_path="data/raw/ParlaMint-NL-en.ana.tgz", output_dir="data/
 
     print(f"Files from '{folder_to_extract}' for years {years} created in {output_dir}")
 
-def get_file_schema(path='data/raw/subset/ParlaMint-NL-en.txt/2022', outpath='data/processed/file_schema.json'):
+def parse_base_name(base_name, chamber_patterns=None, chamber=None):
+    """
+    Parse the date, chamber and debate number from the base name of a debate file.
+
+    The base name starts with the date of the debate, the rest depends on the corpus, e.g.
+    '2022-01-18-eerstekamer-8' (NL) or '2015-01-05-commons' (GB). By default the chamber is the first word and
+    the debate number the last number after the date.
+
+    Args:
+        base_name (str): Base name of the debate file.
+        chamber_patterns (dict): Optional chamber names with the regular expression that identifies them in the
+            base name, for corpora where the chamber is not the first word, e.g. {'nationalrat': r'NRSitzung'} (AT).
+        chamber (str): Optional fixed chamber, e.g. for unicameral parliaments. Takes precedence over the patterns.
+
+    Returns:
+        dict: 'year', 'month', 'day', 'chamber' and 'debate_num' of the debate.
+    """
+    match = re.match(r'(\d{4})-(\d{2})-(\d{2})-?(.*)', base_name)
+    if match is None:
+        raise ValueError(f"Base name '{base_name}' does not start with a date.")
+    year, month, day, rest = match.groups()
+    numbers = re.findall(r'\d+', rest)
+
+    if chamber is None and chamber_patterns is not None:
+        chamber = next((name for name, pattern in chamber_patterns.items() if re.search(pattern, rest)), None)
+    if chamber is None:
+        chambers = re.findall(r'[a-zA-Z]+', rest)
+        chamber = chambers[0] if chambers else ''
+
+    return {
+        'year': year,
+        'month': month,
+        'day': day,
+        'chamber': chamber.lower(),
+        'debate_num': str(int(numbers[-1])) if numbers else '1',
+    }
+
+def get_file_schema(path='data/raw/subset/ParlaMint-NL-en.txt/2022', outpath='data/processed/file_schema.json', corpus=None, chamber_patterns=None, chamber=None):
     """
     Generate a file schema for the extracted files.
 
     Args:
         path (str): Path to the extracted files.
-        outpath (str): Path to save the file schema JSON.
+        outpath (str): Path to save the file schema JSON, or None to only return it.
+        corpus (str): Country code of the corpus, stored with each debate if given.
+        chamber_patterns (dict): Optional patterns to parse the chamber from the base names, see parse_base_name.
+        chamber (str): Optional fixed chamber of all debates, see parse_base_name.
 
     Returns:
-        None
+        dict: File schema dictionary.
     """
     files = glob(f'{path}*.txt') + glob(f'{path}*.tsv')
-    text_ids = [os.path.basename(file).split('.')[0].replace('-meta', '') for file in files]
+
+    # Map each text ID to its text and metadata file
+    src_paths = {}
+    for file in files:
+        text_id = os.path.basename(file).split('.')[0].replace('-meta', '')
+        src_paths.setdefault(text_id, {})['src_path_txt' if file.endswith('.txt') else 'src_path_tsv'] = file
 
     schema = {}
-    for text_id in text_ids:
-        base_name = text_id.split('_')[-1]
-        year, month, day, debate_num = re.findall(r'\d+', base_name)
-        chamber = re.findall(r'[a-zA-Z]+', base_name)[0]
-        src_path_txt = [f for f in files if f.endswith('.txt') and base_name in f][0]
-        src_path_tsv = [f for f in files if f.endswith('.tsv') and base_name in f][0]
-
-        schema[base_name] = {
-            'year': year,
-            'month': month,
-            'day': day,
-            'chamber': chamber,
-            'debate_num': debate_num,
-            'text_id': text_id,
-            'src_path_txt': src_path_txt,
-            'src_path_tsv': src_path_tsv
-        }
-    
-    with open(outpath, 'w') as f:
-        json.dump(schema, f, indent=4)
+    for text_id, paths in src_paths.items():
+        if len(paths) < 2:
+            print(f"Skipping {text_id} as its text or metadata file is missing.")
+            continue
+
+        base_name = text_id.split('_', 1)[-1]
+        schema[base_name] = parse_base_name(base_name, chamber_patterns=chamber_patterns, chamber=chamber)
+        schema[base_name]['text_id'] = text_id
+        schema[base_name]['src_path_txt'] = paths['src_path_txt']
+        schema[base_name]['src_path_tsv'] = paths['src_path_tsv']
+        if corpus is not None:
+            schema[base_name]['corpus'] = corpus
+
+    if outpath is not None:
+        with open(outpath, 'w') as f:
+            json.dump(schema, f, indent=4)
+    return schema
 
 def preprocess_text_file(file_path):
     """
@@ -97,7 +148,7 @@ def preprocess_text_file(file_path):
     with open(file_path, 'w', encoding='utf-8') as file:
         file.writelines(fixed_lines)
 
-def collect_debate(base_name, file_schema, outdir='data/processed/debates/'):
+def collect_debate(base_name, file_schema, outdir='data/processed/debates/', profiler=None, schema_path='data/processed/file_schema.json', log_path=PROFILE_LOG_PATH):
     """
     Collect and concatenate debate text and metadata into a single document.
 
@@ -105,12 +156,23 @@ def collect_debate(base_name, file_schema, outdir='data/processed/debates/'):
         base_name (str): Base name of the debate file.
         file_schema (dict): File schema dictionary.
         outdir (str): Output directory to save the concatenated debate text.
+        profiler (str): Optional profiler to run for this debate ('cprofile' or 'pyinstrument').
+        schema_path (str): Path to save the updated file schema JSON, or None to not save it.
+        log_path (str): Path to the profiling log.
 
     Returns:
-        None
+        str: Path of the concatenated debate text, or None if the text file could not be parsed.
+    """
+    with profile_stage('collect', debate_id=base_name, log_path=log_path, profiler=profiler, corpus=file_schema[base_name].get('corpus')) as record:
+        return _collect_debate(base_name, file_schema, outdir, schema_path, record)
+
+def _collect_debate(base_name, file_schema, outdir, schema_path, record):
+    """
+    Collect a single debate, see collect_debate. Adds the number of bytes read to the profiling record.
     """
     txt_path = file_schema[base_name]['src_path_txt']
     tsv_path = file_schema[base_name]['src_path_tsv']
+    record['bytes_read'] = os.path.getsize(txt_path) + os.path.getsize(tsv_path)
 
     # Preprocess the text file to fix unclosed quotation marks
     preprocess_text_file(txt_path)
@@ -149,9 +211,7 @@ def collect_debate(base_name, file_schema, outdir='data/processed/debates/'):
     doc = '\n'.join(df_text.apply(conc_row, axis=1))
 
     # Write the document to a file from which it can be read later
-    if not os.path.exists(outdir):
-        os.makedirs(outdir)
-        print(f"Created directory: {outdir}")
+    os.makedirs(outdir, exist_ok=True)
 
     outpath = f'{outdir}{base_name}.txt'
     with open(outpath, 'w') as f:
@@ -159,22 +219,51 @@ def collect_debate(base_name, file_schema, outdir='data/processed/debates/'):
     
     # Add outpath to file_schema
     file_schema[base_name]['conc_debate_path'] = outpath
-    with open('data/processed/file_schema.json', 'w') as f:
-        json.dump(file_schema, f, indent=4)
+    if schema_path is not None:
+        with open(schema_path, 'w') as f:
+            json.dump(file_schema, f, indent=4)
+    return outpath
 
-def collect_all_debates(file_schema, outdir='data/processed/debates/'):
+def collect_all_debates(file_schema, outdir='data/processed/debates/', profiler=None, schema_path='data/processed/file_schema.json', executor=None, log_path=PROFILE_LOG_PATH):
     """
     Collect and concatenate all debates based on the file schema.
 
     Args:
         file_schema (dict): File schema dictionary.
         outdir (str): Output directory to save the concatenated debate texts.
+        profiler (str): Optional profiler to run for each debate ('cprofile' or 'pyinstrument').
+        schema_path (str): Path to save the updated file schema JSON, or None to not save it.
+        executor (concurrent.futures.Executor): Optional worker pool to collect the debates in parallel,
+            can be shared across corpora.
+        log_path (str): Path to the profiling log.
 
     Returns:
         None
     """
-    for base_name in tqdm(file_schema.keys(), desc='Collecting debates', colour='green'):
-        collect_debate(base_name, file_schema, outdir=outdir)
+    # Create the output directory once, before workers write to it
+    if not os.path.exists(outdir):
+        os.makedirs(outdir, exist_ok=True)
+        print(f"Created directory: {outdir}")
+
+    if executor is None:
+        for base_name in tqdm(file_schema.keys(), desc='Collecting debates', colour='green'):
+            collect_debate(base_name, file_schema, outdir=outdir, profiler=profiler, schema_path=None, log_path=log_path)
+    else:
+        # Send only the debate's own schema entry to the workers and update the schema with the results
+        futures = {
+            executor.submit(collect_debate, base_name, {base_name: file_schema[base_name]}, outdir, profiler, None, log_path): base_name
+            for base_name in file_schema.keys()
+        }
+        for future in tqdm(as_completed(futures), total=len(futures), desc='Collecting debates', colour='green'):
+            outpath = future.result()
+            if outpath is not None:
+                file_schema[futures[future]]['conc_debate_path'] = outpath
+
+    if schema_path is not None:
+        with profile_stage('collect', log_path=log_path) as record:
+            record['step'] = 'write_schema'
+            with open(schema_path, 'w') as f:
+                json.dump(file_schema, f, indent=4)
 
 def get_date_from_base_name(base_name):
     """
@@ -186,5 +275,5 @@ def get_date_from_base_name(base_name):
     Returns:
         str: Date in the format 'YYYY-MM-DD'.
     """
-    year, month, day, debate_num = re.findall(r'\d+', base_name)
-    return f"{year}-{month}-{day}"
\ No newline at end of file
+    debate = parse_base_name(base_name)
+    return f"{debate['year']}-{debate['month']}-{debate['day']}"
\ No newline at end of file
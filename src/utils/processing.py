@@ -1,18 +1,51 @@
-from helpers import get_file_schema, collect_all_debates
+from helpers import create_subset, get_file_schema, collect_all_debates
+from corpus_registry import get_corpus, year_path, processed_path
+from profiling import PROFILE_LOG_FILE
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
 import json
 
-def main():
-    path = 'data/raw/subset/ParlaMint-NL-en.txt/2022/'
-    get_file_schema(path)
-    print('File schema created.')
-    
-    with open('data/processed/file_schema.json', 'r') as f:
-        file_schema = json.load(f)
-    print(f'File schema loaded: {len(file_schema)} debates.')
+def process_corpus(code, years=None, executor=None):
+    """
+    Extract, index and collect the debates of a ParlaMint corpus.
 
-    collect_all_debates(file_schema)
+    Args:
+        code (str): Country code of the corpus, see corpus_registry.
+        years (list): Years to process, defaults to the years registered for the corpus.
+        executor (concurrent.futures.Executor): Optional worker pool to collect the debates, can be shared across corpora.
 
+    Returns:
+        None
+    """
+    corpus = get_corpus(code)
+    years = years or corpus['years']
 
-if __name__ == '__main__':
-    main()
+    if os.path.exists(corpus['tar_path']):
+        create_subset(tar_path=corpus['tar_path'], output_dir=corpus['raw_dir'], folder_to_extract=corpus['folder'], years=years)
+    else:
+        print(f"Archive {corpus['tar_path']} not found, using the already extracted files.")
+
+    file_schema = {}
+    for year in years:
+        file_schema.update(get_file_schema(year_path(code, year), outpath=None, corpus=code, chamber_patterns=corpus['chamber_patterns'], chamber=corpus['chamber']))
+
+    if not os.path.exists(corpus['processed_dir']):
+        os.makedirs(corpus['processed_dir'])
+    schema_path = processed_path(code, 'file_schema.json')
+    with open(schema_path, 'w') as f:
+        json.dump(file_schema, f, indent=4)
+    print(f'File schema for {corpus["name"]} created: {len(file_schema)} debates.')
+
+    collect_all_debates(file_schema, outdir=processed_path(code, 'debates/'), schema_path=schema_path, executor=executor, log_path=processed_path(code, PROFILE_LOG_FILE))
 
+def main(codes=('NL',), max_workers=None):
+    # One worker pool for all corpora
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        for code in codes:
+            process_corpus(code, executor=executor)
+
+
+if __name__ == '__main__':
+    # Optional corpus codes as arguments, e.g. 'NL DK'
+    main(codes=tuple(sys.argv[1:]) or ('NL',))
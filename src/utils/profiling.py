@@ -0,0 +1,233 @@
+import os
+import sys
+import io
+import json
+import time
+import pstats
+import cProfile
+from contextlib import contextmanager
+import pandas as pd
+
+PROFILE_LOG_PATH = 'data/processed/profiling/profile_log.jsonl'
+PROFILE_DIR = 'data/processed/profiling'
+# Log of a corpus relative to its output directory, see corpus_registry.processed_path
+PROFILE_LOG_FILE = 'profiling/profile_log.jsonl'
+
+# One ID per pipeline run, passed to the worker processes of the run through the environment
+RUN_ID = os.environ.setdefault('PARLAMINT_PROFILE_RUN_ID', f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+
+def get_rss_mb():
+    """
+    Get the resident set size (RSS) of the current process.
+
+    Uses psutil if it is installed, otherwise falls back to the peak RSS reported by the
+    resource module (not available on Windows).
+
+    Returns:
+        float: RSS in megabytes, or None if it cannot be determined.
+    """
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / 1024 ** 2
+    except ImportError:
+        pass
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    # ru_maxrss is reported in bytes on macOS and in kilobytes on Linux
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == 'darwin':
+        return max_rss / 1024 ** 2
+    return max_rss / 1024
+
+@contextmanager
+def run_profiler(profiler, stage, debate_id=None, outdir=PROFILE_DIR):
+    """
+    Run a cProfile or pyinstrument profiler around a block of code and save its output.
+
+    Args:
+        profiler (str): Profiler to use ('cprofile' or 'pyinstrument'), or None to disable profiling.
+        stage (str): Name of the profiled pipeline stage.
+        debate_id (str): Base name of the profiled debate, if any.
+        outdir (str): Directory to save the profiler output.
+
+    Yields:
+        None
+    """
+    if profiler is None:
+        yield
+        return
+
+    os.makedirs(outdir, exist_ok=True)
+    name = f'{stage}_{debate_id}' if debate_id else stage
+
+    if profiler == 'cprofile':
+        prof = cProfile.Profile()
+        prof.enable()
+        try:
+            yield
+        finally:
+            prof.disable()
+            prof.dump_stats(os.path.join(outdir, f'{name}.prof'))
+    elif profiler == 'pyinstrument':
+        from pyinstrument import Profiler
+        prof = Profiler()
+        prof.start()
+        try:
+            yield
+        finally:
+            prof.stop()
+            with open(os.path.join(outdir, f'{name}.html'), 'w', encoding='utf-8') as f:
+                f.write(prof.output_html())
+    else:
+        raise ValueError(f"Unknown profiler '{profiler}', expected 'cprofile' or 'pyinstrument'.")
+
+@contextmanager
+def profile_stage(stage, debate_id=None, log_path=PROFILE_LOG_PATH, profiler=None, corpus=None):
+    """
+    Record wall time and memory usage of a pipeline stage as a JSON line.
+
+    The yielded record can be filled with additional metrics by the caller, e.g. 'bytes_read',
+    'n_tokens' or 'forward_time'. Records without a debate cover the work of the whole stage, e.g. loading
+    the model or writing the results, and name it in 'step'. The record is written to the log even if the
+    stage fails.
+
+    Args:
+        stage (str): Name of the pipeline stage, e.g. 'collect', 'summarize' or 'detect_topics'.
+        debate_id (str): Base name of the processed debate, or None for a whole stage.
+        log_path (str): Path to the JSON lines log file.
+        profiler (str): Optional profiler to run around the stage ('cprofile' or 'pyinstrument').
+        corpus (str): Country code of the processed corpus, if known.
+
+    Yields:
+        dict: The record that will be written to the log.
+    """
+    record = {
+        'run_id': RUN_ID,
+        'corpus': corpus,
+        'stage': stage,
+        'debate_id': debate_id,
+        'start': time.time(),
+    }
+    rss_before = get_rss_mb()
+    start = time.perf_counter()
+    try:
+        with run_profiler(profiler, stage, debate_id, outdir=os.path.dirname(log_path) or '.'):
+            yield record
+        record['status'] = 'ok'
+    except Exception:
+        record['status'] = 'error'
+        raise
+    finally:
+        record['wall_time'] = time.perf_counter() - start
+        record['rss_before_mb'] = rss_before
+        record['rss_after_mb'] = get_rss_mb()
+        write_record(record, log_path)
+
+def write_record(record, log_path=PROFILE_LOG_PATH):
+    """
+    Append a profiling record to a JSON lines log file.
+
+    Args:
+        record (dict): Profiling record.
+        log_path (str): Path to the JSON lines log file.
+
+    Returns:
+        None
+    """
+    log_dir = os.path.dirname(log_path)
+    if log_dir:
+        os.makedirs(log_dir, exist_ok=True)
+
+    with open(log_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+
+def load_records(log_path=PROFILE_LOG_PATH):
+    """
+    Load profiling records from a JSON lines log file.
+
+    Args:
+        log_path (str): Path to the JSON lines log file.
+
+    Returns:
+        pd.DataFrame: One row per profiling record.
+    """
+    return pd.read_json(log_path, lines=True)
+
+def report(log_path=PROFILE_LOG_PATH, top_n=10, run_id=None):
+    """
+    Rank the slowest pipeline stages and debates of a run from a profiling log.
+
+    Args:
+        log_path (str): Path to the JSON lines log file.
+        top_n (int): Number of slowest debates to show.
+        run_id (str): Run to report, defaults to the latest run. Use 'all' to report all runs of the log.
+
+    Returns:
+        tuple: DataFrames with the per-stage summary and the slowest debates.
+    """
+    df = load_records(log_path)
+
+    # Logs written before run IDs were recorded are reported as a whole
+    if run_id != 'all' and 'run_id' in df.columns and df['run_id'].notna().any():
+        if run_id is None:
+            run_id = df.loc[df['start'].idxmax(), 'run_id']
+        df = df[df['run_id'] == run_id]
+
+    debates = df[df['debate_id'].notna()]
+
+    # Whole-stage records are overhead of the stage and not part of the per-debate times
+    stages = debates.groupby('stage').agg(
+        debates=('wall_time', 'size'),
+        debate_time=('wall_time', 'sum'),
+        mean_time=('wall_time', 'mean'),
+        max_time=('wall_time', 'max'),
+    )
+    overhead = df[df['debate_id'].isna()].groupby('stage')['wall_time'].sum().rename('overhead_time')
+    stages = stages.join(overhead, how='outer').fillna({'debates': 0, 'debate_time': 0, 'overhead_time': 0})
+    stages['debates'] = stages['debates'].astype(int)
+    stages['total_time'] = stages['debate_time'] + stages['overhead_time']
+    stages['max_rss_mb'] = df.groupby('stage')['rss_after_mb'].max()
+    stages = stages.sort_values('total_time', ascending=False)
+    stages['share'] = stages['total_time'] / stages['total_time'].sum()
+
+    metric_cols = [col for col in ['bytes_read', 'n_tokens', 'forward_time'] if col in debates.columns]
+    slowest = debates.sort_values('wall_time', ascending=False).head(top_n)
+    id_cols = [col for col in ['corpus', 'stage', 'debate_id'] if col in debates.columns]
+    slowest = slowest[id_cols + ['wall_time'] + metric_cols]
+
+    return stages, slowest
+
+def print_cprofile_stats(prof_path, num_lines=20):
+    """
+    Print the most expensive functions of a saved cProfile run.
+
+    Args:
+        prof_path (str): Path to the .prof file.
+        num_lines (int): Number of functions to print.
+
+    Returns:
+        None
+    """
+    stream = io.StringIO()
+    pstats.Stats(prof_path, stream=stream).sort_stats('cumulative').print_stats(num_lines)
+    print(stream.getvalue())
+
+def main():
+    # Optional log path and run ID as arguments, the run ID defaults to the latest run
+    log_path = sys.argv[1] if len(sys.argv) > 1 else PROFILE_LOG_PATH
+    run_id = sys.argv[2] if len(sys.argv) > 2 else None
+    stages, slowest = report(log_path, run_id=run_id)
+
+    print('Time per stage:')
+    print(stages.to_string(float_format=lambda x: f'{x:.2f}'))
+    print()
+    print(f'Slowest {len(slowest)} debates:')
+    print(slowest.to_string(index=False, float_format=lambda x: f'{x:.2f}'))
+
+
+if __name__ == '__main__':
+    main()
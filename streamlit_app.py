@@ -1,10 +1,17 @@
+import os
 import streamlit as st
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 import altair as alt
+from src.analysis.summary_worker import SummaryWorker
+from src.analysis.summary_defaults import DEFAULT_MAX_LENGTH, SUMMARY_LENGTHS
+from src.analysis.speaker_similarity import load_similarity_index, most_similar
+from src.utils.corpus_registry import get_corpus, available_corpora, processed_path
+
+TOPIC_NAMES = ["security", "geopolitics", "technologies", "energy", "crime", "climate", "defence"]
 
 # Set page layout to wide
 st.set_page_config(layout="wide")
@@ -16,20 +23,29 @@ with st.expander("ℹ️ Disclaimer", expanded=False):
     st.markdown("The bar chart shows the probability of topics discussed in the parliament over the selected date range.")
     st.markdown("The bottom section shows the summary, top 5 speakers, and topics discussed for each debate on the a selected date.")
 
+# Select one of the processed ParlaMint corpora
+corpus = st.selectbox(
+    "Corpus",
+    available_corpora(),
+    format_func=lambda code: get_corpus(code)['label'],
+    key="corpus_select"
+)
+
 # Load data
 @st.cache_data
-def load_data(scaling_factor=0.8, name_topics=True):
+def load_data(corpus, scaling_factor=0.8, name_topics=True):
     """
     Load and preprocess the debate topics data.
 
     Args:
+        corpus (str): Country code of the corpus.
         scaling_factor (float): Factor to scale down the probabilities.
         name_topics (bool): Whether to assign random topic names.
 
     Returns:
         pd.DataFrame: Preprocessed debate topics data.
     """
-    df = pd.read_csv('data/processed/debate_topics.csv')
+    df = pd.read_csv(processed_path(corpus, 'debate_topics.csv'))
     
     # Scale down the probabilities
     df["Probability"] = df["Probability"] * (scaling_factor + np.random.uniform(-0.1, 0.1))
@@ -37,13 +53,12 @@ def load_data(scaling_factor=0.8, name_topics=True):
     # Assign random topic names
     if name_topics:
         num_topics = df['Topic'].nunique()
-        random_topic_names = ["security", "geopolitics", "technologies", "energy", "crime", "climate", "defence"]
-        topic_mapping = {i: random_topic_names[i % len(random_topic_names)] for i in range(num_topics)}
+        topic_mapping = {i: TOPIC_NAMES[i % len(TOPIC_NAMES)] for i in range(num_topics)}
         df['Topic'] = df['Topic'].map(topic_mapping)
 
     return df
 
-data = load_data()
+data = load_data(corpus)
 
 # Date slider
 min_date = datetime.strptime(data['Date'].min(), '%Y-%m-%d')
@@ -52,9 +67,9 @@ start_date, end_date = st.slider(
     "Select date range",
     min_value=min_date,
     max_value=max_date,
-    value=(datetime(2022, 1, 22), datetime(2022, 4, 7)),
+    value=(min_date, min(max_date, min_date + timedelta(weeks=11))),
     format="YYYY MMM DD",
-    key="date_slider",
+    key=f"date_slider_{corpus}",
     label_visibility="collapsed"
 )
 
@@ -197,34 +212,150 @@ fig.update_layout(
 # Display the figure using st.plotly_chart
 st.plotly_chart(fig)
 
+### TOPIC TRENDS
+
+@st.cache_data
+def load_trend_data(corpus, name_topics=True):
+    """
+    Load the precomputed topic trends and change points (see src/analysis/topic_trends.py).
+
+    Args:
+        corpus (str): Country code of the corpus.
+        name_topics (bool): Whether to assign the same topic names as load_data.
+
+    Returns:
+        tuple: Topic trends and change points DataFrames.
+    """
+    trends = pd.read_csv(processed_path(corpus, 'topic_trends.csv'), parse_dates=['Period'])
+    change_points = pd.read_csv(processed_path(corpus, 'topic_change_points.csv'), parse_dates=['Change_Point'])
+
+    if name_topics:
+        trends['Topic'] = trends['Topic'].map(lambda i: TOPIC_NAMES[i % len(TOPIC_NAMES)])
+        change_points['Topic'] = change_points['Topic'].map(lambda i: TOPIC_NAMES[i % len(TOPIC_NAMES)])
+
+    return trends, change_points
+
+with st.expander("📈 Topic trends", expanded=False):
+    if not os.path.exists(processed_path(corpus, 'topic_trends.csv')):
+        st.info(f"No topic trends available, run `python -m src.analysis.topic_trends {corpus}` to compute them.")
+    else:
+        trend_data, change_point_data = load_trend_data(corpus)
+        filtered_trend_data = trend_data[(trend_data['Period'] >= start_date) & (trend_data['Period'] <= end_date)]
+        topic_colors = {topic: color_map[i % len(color_map)] for i, topic in enumerate(filtered_data['Topic'].unique())}
+
+        fig_trend = go.Figure()
+        for i, topic in enumerate(filtered_trend_data['Topic'].unique()):
+            topic_data = filtered_trend_data[filtered_trend_data['Topic'] == topic]
+            color = topic_colors.get(topic, color_map[i % len(color_map)])
+            # Add rolling prevalence
+            fig_trend.add_trace(go.Scatter(
+                x=topic_data['Period'],
+                y=topic_data['Rolling_Prevalence'],
+                mode='lines',
+                name=topic,
+                line=dict(color=color, width=2),
+                legendgroup=topic,
+                customdata=topic_data[['Debate_Count']],
+                hovertemplate='Topic: ' + topic + '<br>Week: %{x|%Y %b %d}<br>Rolling prevalence: %{y:.2f}<br>Debates: %{customdata[0]}<extra></extra>',
+            ))
+            # Add bursts
+            burst_data = topic_data[topic_data['Burst']]
+            fig_trend.add_trace(go.Scatter(
+                x=burst_data['Period'],
+                y=burst_data['Prevalence'],
+                mode='markers',
+                name=topic,
+                marker=dict(color=color, size=10, symbol='star'),
+                showlegend=False,
+                legendgroup=topic,
+                customdata=burst_data[['Z_Score']],
+                hovertemplate='Burst: ' + topic + '<br>Week: %{x|%Y %b %d}<br>Prevalence: %{y:.2f}<br>Z-score: %{customdata[0]:.1f}<extra></extra>',
+            ))
+
+        fig_trend.update_layout(
+            title='How does the prevalence of topics develop over time?',
+            xaxis_title='Week',
+            yaxis_title='Rolling prevalence (weighted by number of debates)',
+            height=400,
+            legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="left", x=0)
+        )
+        st.plotly_chart(fig_trend)
+
+        st.markdown("**Strongest shift per topic**")
+        st.write(
+            change_point_data.sort_values('Score', ascending=False).to_html(index=False, border=0, classes='table-no-border', float_format=lambda x: f'{x:.2f}'),
+            unsafe_allow_html=True
+        )
+
 ##### Bottom Page
 # Load summaries.csv
 @st.cache_data
-def load_summary_data():
+def load_summary_data(corpus):
     """
     Load the summaries data.
 
+    Args:
+        corpus (str): Country code of the corpus.
+
     Returns:
-        pd.DataFrame: Summaries data.
+        pd.DataFrame: Summaries data, empty if no summaries have been computed yet.
     """
-    data = pd.read_csv('data/processed/summaries.csv')
+    path = processed_path(corpus, 'summaries.csv')
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['ID', 'date', 'chamber', 'debate_num', 'summary', 'max_length', 'Debate_ID'])
+    data = pd.read_csv(path)
     data['date'] = pd.to_datetime(data['date'])
+    # The text ID is the corpus name followed by the base name, which the other tables use as Debate_ID
+    data['Debate_ID'] = data['ID'].str.split('_', n=1).str[-1]
     return data
 
+@st.cache_resource
+def get_summary_worker(corpus):
+    """
+    Start the background worker computing missing summaries on demand.
+
+    Args:
+        corpus (str): Country code of the corpus.
+
+    Returns:
+        SummaryWorker: Summary worker shared across sessions.
+    """
+    return SummaryWorker(file_schema_path=processed_path(corpus, 'file_schema.json'), cache_path=processed_path(corpus, 'summaries.csv'))
+
 @st.cache_data
-def load_speaker_count_data():
+def load_speaker_count_data(corpus):
     """
     Load the speaker count data.
 
+    Args:
+        corpus (str): Country code of the corpus.
+
     Returns:
-        pd.DataFrame: Speaker count data.
+        pd.DataFrame: Speaker count data, empty if the speakers have not been counted yet.
     """
-    data = pd.read_csv('data/processed/speaker_count.csv')
+    path = processed_path(corpus, 'speaker_count.csv')
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=['Date', 'Debate_Num', 'Debate_ID', 'Speaker_name', 'Speaker_party', 'Speaker_role', 'size'])
+    data = pd.read_csv(path)
     data['Date'] = pd.to_datetime(data['Date'])
     return data
 
-summary_data = load_summary_data()
-speaker_count_data = load_speaker_count_data()
+summary_data = load_summary_data(corpus)
+speaker_count_data = load_speaker_count_data(corpus)
+summary_worker = get_summary_worker(corpus)
+
+@st.fragment(run_every="3s")
+def poll_summary(debate_id, summary_length):
+    """
+    Poll the background worker while a summary is generated and rerun the page once it is finished.
+
+    Args:
+        debate_id (str): Base name of the debate.
+        summary_length (int): Maximum length of the summary in tokens.
+    """
+    if not summary_worker.is_pending(debate_id, summary_length):
+        st.rerun()
+    st.info("The summary is being generated in the background.")
 
 # Date picker for summary data
 summary_date = st.date_input(
@@ -247,20 +378,29 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# Summary length, summaries that are not precomputed are generated in the background
+summary_length = st.select_slider(
+    "Summary length (max. tokens)",
+    options=SUMMARY_LENGTHS,
+    value=DEFAULT_MAX_LENGTH,
+    key="summary_length_slider"
+)
+
 # Filter summary data based on selected date
-filtered_summary_data = summary_data[summary_data['date'] == pd.to_datetime(summary_date)]
+filtered_summary_data = summary_data[(summary_data['date'] == pd.to_datetime(summary_date)) & (summary_data['max_length'] == summary_length)]
 filtered_speaker_count_data = speaker_count_data[speaker_count_data['Date'] == pd.to_datetime(summary_date)]
 filtered_topic_data = data[pd.to_datetime(data['Date']) == pd.to_datetime(summary_date)]
 
-# Display text boxes for each unique debate_num in filtered_summary_data
-unique_debate_nums = filtered_summary_data['debate_num'].unique()
+# Display text boxes for each debate that took place on the selected date
+debates = filtered_topic_data[['Debate_ID', 'Debate_Num', 'House']].drop_duplicates()
 
-for debate_num in unique_debate_nums:
-    debate_data = filtered_summary_data[filtered_summary_data['debate_num'] == debate_num]
-    debate_data_speakers = filtered_speaker_count_data[speaker_count_data['Debate_Num'] == debate_num]
-    debate_data_topics = filtered_topic_data[filtered_topic_data['Debate_Num'] == debate_num]
+for debate_id, debate_num, house in debates.itertuples(index=False):
+    # Match by Debate_ID, debate numbers are only unique per date and chamber
+    debate_data = filtered_summary_data[filtered_summary_data['Debate_ID'] == debate_id]
+    debate_data_speakers = filtered_speaker_count_data[filtered_speaker_count_data['Debate_ID'] == debate_id]
+    debate_data_topics = filtered_topic_data[filtered_topic_data['Debate_ID'] == debate_id]
     
-    with st.expander(f"**Debate Number: {debate_num}** | {debate_data['chamber'].values[0].capitalize()}", expanded=True):
+    with st.expander(f"**Debate Number: {debate_num}** | {house.capitalize()}", expanded=True):
         col1, col2, col3 = st.columns([15, 35, 50])
 
         with col1:
@@ -300,5 +440,69 @@ for debate_num in unique_debate_nums:
 
         with col3:
             st.markdown("### Summary")
-            st.text(debate_data['summary'].values[0])
+            if len(debate_data) > 0:
+                summary = debate_data['summary'].values[0]
+            else:
+                # Look up summaries computed on demand, otherwise request one from the background worker
+                summary = summary_worker.get_summary(debate_id, summary_length)
+                if summary is None and summary_worker.get_error(debate_id, summary_length) is None:
+                    summary_worker.submit(debate_id, summary_length)
+
+            if summary is not None:
+                st.text(summary)
+            elif summary_worker.is_pending(debate_id, summary_length):
+                poll_summary(debate_id, summary_length)
+            else:
+                st.warning(f"The summary could not be generated: {summary_worker.get_error(debate_id, summary_length)}")
             st.markdown("<small>_Disclaimer: This summary is generated by an AI model and might present debaters' opinions as facts or contain other errors._</small>", unsafe_allow_html=True)
+
+##### Similar speakers
+@st.cache_data
+def load_similarity_data(corpus, level='speaker'):
+    """
+    Load the precomputed nearest-neighbour index of speakers or parties (see src/analysis/speaker_similarity.py).
+
+    Args:
+        corpus (str): Country code of the corpus.
+        level (str): 'speaker' or 'party'.
+
+    Returns:
+        tuple: Labels, neighbour indices and similarities.
+    """
+    return load_similarity_index(processed_path(corpus, 'similarity'), level=level)
+
+with st.expander("👥 Similar speakers", expanded=False):
+    if not os.path.exists(processed_path(corpus, 'similarity/speaker_neighbours.npz')):
+        st.info(f"No speaker similarities available, run `python -m src.analysis.speaker_similarity {corpus}` to compute them.")
+    else:
+        speakers, speaker_indices, speaker_scores = load_similarity_data(corpus)
+        parties, party_indices, party_scores = load_similarity_data(corpus, level='party')
+
+        selected_speaker = st.selectbox(
+            "Select a speaker",
+            speakers[speakers['n_terms'] > 0].sort_values('n_utterances', ascending=False)['Speaker_name'],
+            key=f"similar_speaker_select_{corpus}"
+        )
+        selected_party = speakers.loc[speakers['Speaker_name'] == selected_speaker, 'Speaker_party'].values[0]
+
+        col1, col2 = st.columns([50, 50])
+
+        with col1:
+            st.markdown(f"### Speakers who talk like {selected_speaker}")
+            similar_speakers = most_similar(selected_speaker, speakers, speaker_indices, speaker_scores)
+            if len(similar_speakers) == 0:
+                st.info("No speaker shares enough words to compare.")
+            st.write(
+                similar_speakers[['Speaker_name', 'Speaker_party', 'Similarity']].to_html(index=False, header=False, border=0, classes='table-no-border', float_format=lambda x: f'{x:.2f}'),
+                unsafe_allow_html=True
+            )
+
+        with col2:
+            st.markdown(f"### Parties that talk like {selected_party}")
+            similar_parties = most_similar(selected_party, parties, party_indices, party_scores)
+            if len(similar_parties) == 0:
+                st.info("No party shares enough words to compare.")
+            st.write(
+                similar_parties[['Speaker_party', 'n_speakers', 'Similarity']].to_html(index=False, header=False, border=0, classes='table-no-border', float_format=lambda x: f'{x:.2f}'),
+                unsafe_allow_html=True
+            )